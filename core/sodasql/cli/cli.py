@@ -270,17 +270,15 @@ def analyze(warehouse_yml_file: str, include: str, exclude: str, limit: int):
         dialect = warehouse.dialect
 
         if hasattr(dialect, "sql_tables_metadata"):
-            rows = dialect.sql_tables_metadata()
+            table_names = [row[0] for row in dialect.sql_tables_metadata()]
         else:
             tables_metadata_query = dialect.sql_tables_metadata_query(limit=limit)
-            rows = warehouse.sql_fetchall(tables_metadata_query)
+            table_names = warehouse.sql_fetchall_column0(tables_metadata_query)
 
         table_include_regex = create_table_filter_regex(include)
         table_exclude_regex = create_table_filter_regex(exclude)
 
-        for row in rows:
-            table_name = row[0]
-
+        for table_name in table_names:
             if (matches_table_include(table_name, table_include_regex)
                 and matches_table_exclude(table_name, table_exclude_regex)):
                 dataset_analyzer = DatasetAnalyzer()
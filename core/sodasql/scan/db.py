@@ -30,13 +30,13 @@ def sql_fetchone_description(connection, sql: str) -> tuple:
     """
     cursor = connection.cursor()
     try:
-        logger.debug(f'Executing SQL query: \n{sql}')
+        logger.debug('Executing SQL query: \n%s', sql)
         start = datetime.now()
         cursor.execute(sql)
         row_tuple = cursor.fetchone()
         description = cursor.description
         delta = datetime.now() - start
-        logger.debug(f'SQL took {str(delta)}')
+        logger.debug('SQL took %s', delta)
         return row_tuple, description
     finally:
         cursor.close()
@@ -57,25 +57,42 @@ def sql_fetchall_description(connection, sql: str) -> tuple:
     """
     cursor = connection.cursor()
     try:
-        logger.debug(f'Executing SQL query: \n{sql}')
+        logger.debug('Executing SQL query: \n%s', sql)
         start = datetime.now()
         cursor.execute(sql)
         rows = cursor.fetchall()
         delta = datetime.now() - start
-        logger.debug(f'SQL took {str(delta)}')
+        logger.debug('SQL took %s', delta)
         return rows, cursor.description
     finally:
         cursor.close()
 
 
+def sql_fetchall_column0(connection, sql: str) -> list:
+    """
+    Returns the values of the first column of all rows, unpacked while fetching from the cursor
+    """
+    cursor = connection.cursor()
+    try:
+        logger.debug('Executing SQL query: \n%s', sql)
+        start = datetime.now()
+        cursor.execute(sql)
+        values = [row[0] for row in cursor.fetchall()]
+        delta = datetime.now() - start
+        logger.debug('SQL took %s', delta)
+        return values
+    finally:
+        cursor.close()
+
+
 def sql_update(connection, sql: str):
     cursor = connection.cursor()
     try:
-        logger.debug(f'Executing SQL update: \n{sql}')
+        logger.debug('Executing SQL update: \n%s', sql)
         start = datetime.now()
         cursor.execute(sql)
         delta = datetime.now() - start
-        logger.debug(f'SQL took {str(delta)}')
+        logger.debug('SQL took %s', delta)
     finally:
         cursor.close()
 
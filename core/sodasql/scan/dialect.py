@@ -16,7 +16,7 @@ from datetime import date
 import hashlib
 import json
 from numbers import Number
-from typing import List, Optional
+from typing import List, Optional, Tuple
 import importlib
 import logging
 
@@ -50,6 +50,9 @@ ALL_WAREHOUSE_TYPES = [ATHENA,
                        SPARK,
                        TRINO]
 
+# nullable values in columns metadata that mean the column is nullable
+NULLABLE_TRUE_VALUES = frozenset(['YES', 'Yes', 'yes', 'Y', 'y', 'TRUE', 'True', 'true', '1'])
+
 logger = logging.getLogger(__name__)
 
 
@@ -60,9 +63,14 @@ class Dialect(metaclass=abc.ABCMeta):
     data_type_decimal = "REAL"
     data_type_date = "DATE"
     reserved_keywords = []
+    # GROUP BY GROUPING SETS lets the group by value queries scan the table once for several columns.
+    # Only enabled in the dialects that are known to support it
+    supports_grouping_sets = False
 
     def __init__(self, type: str):
         self.type = type
+        # maps column data types to their (is_text, is_number, is_time, is_supported) flags
+        self.data_type_flags_cache = {}
 
     @staticmethod
     def _import_class(module_name, class_name):
@@ -205,6 +213,20 @@ class Dialect(metaclass=abc.ABCMeta):
                 or self.is_number(column_type)
                 or self.is_time(column_type))
 
+    def get_data_type_flags(self, column_type: str) -> Tuple[bool, bool, bool, bool]:
+        """
+        Returns (is_text, is_number, is_time, is_supported) for the column type.  Tables typically have many
+        columns of the same types, so the flags are computed once per type for all scans on this dialect.
+        """
+        flags = self.data_type_flags_cache.get(column_type)
+        if flags is None:
+            flags = (bool(self.is_text(column_type)),
+                     bool(self.is_number(column_type)),
+                     bool(self.is_time(column_type)),
+                     bool(self.is_supported(column_type)))
+            self.data_type_flags_cache[column_type] = flags
+        return flags
+
     def sql_create_table(
         self,
         table_name: str,
@@ -265,6 +287,10 @@ class Dialect(metaclass=abc.ABCMeta):
     def sql_expr_limit(self, count):
         return f'LIMIT {count}'
 
+    def sql_group_by_grouping_sets(self, exprs: List[str]):
+        grouping_sets = ', '.join([f'({expr})' for expr in exprs])
+        return f'GROUP BY GROUPING SETS ({grouping_sets})'
+
     def sql_select_with_limit(self, table_name, count):
         return f'SELECT * FROM {table_name} LIMIT {count}'
 
@@ -494,6 +520,15 @@ class Dialect(metaclass=abc.ABCMeta):
     def sql_columns_metadata(self, table_name: str) -> List[tuple]:
         return []
 
+    def parse_nullable(self, value) -> bool:
+        """
+        Converts the nullable value of a columns metadata tuple to a bool.  Information schemas return
+        'YES' or 'NO', some drivers return 'Y' or 'N', 1 or 0 or a bool.
+        """
+        if isinstance(value, str):
+            return value in NULLABLE_TRUE_VALUES
+        return bool(value)
+
     def validate_connection(self):
         # to be overriden by subclass
         pass
@@ -156,6 +156,7 @@ class Sampler:
                              (f'{self._fileify(column_name)}_' if column_name else '') +
                              f'{sample_name}.jsonl')
 
+                self.scan.wait_for_measurements_sent()
                 file_id = self.scan.soda_server_client.scan_upload(self.scan.scan_reference,
                                                                    file_path,
                                                                    temp_file,
@@ -12,15 +12,21 @@
 import logging
 import os
 import json
+import queue
 import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from math import floor, ceil
-from typing import List, Optional
+from typing import Dict, List, Optional, Set, Tuple
 
 from jinja2 import Template
 from sodasql.scan.historic_metric_yml import HistoricMetricYml
 
 from sodasql.scan.column_metadata import ColumnMetadata
+from sodasql.scan.db import sql_fetchall
 from sodasql.scan.group_value import GroupValue
 from sodasql.scan.measurement import Measurement
 from sodasql.scan.metric import Metric
@@ -37,6 +43,43 @@ from sodasql.scan.failed_rows_processor import FailedRowsProcessor
 
 logger = logging.getLogger(__name__)
 
+GROUP_BY_VALUE_METRICS = [Metric.DISTINCT, Metric.UNIQUENESS, Metric.UNIQUE_COUNT,
+                          Metric.MINS, Metric.MAXS, Metric.FREQUENT_VALUES, Metric.DUPLICATE_COUNT]
+# max number of columns for which the group by values are computed in a single query
+GROUP_BY_VALUE_BATCH_SIZE = 10
+# max number of tables of which the columns metadata is cached
+SCHEMA_CACHE_MAX_SIZE = 1000
+# maps (warehouse name, database name, database schema, table name) to (time.monotonic() when the entry
+# expires, column tuples), least recently used first.  Only used by scans that opt in with schema_cache_ttl
+_schema_cache = OrderedDict()
+_schema_cache_lock = threading.Lock()
+
+
+def _get_cached_column_tuples(cache_key: tuple) -> Optional[list]:
+    with _schema_cache_lock:
+        cached = _schema_cache.get(cache_key)
+        if cached is None:
+            return None
+        if cached[0] <= time.monotonic():
+            del _schema_cache[cache_key]
+            return None
+        _schema_cache.move_to_end(cache_key)
+        return cached[1]
+
+
+def _cache_column_tuples(cache_key: tuple, column_tuples: list, ttl: int):
+    """
+    Removes the expired entries and, if the cache is full, the least recently used entries
+    """
+    with _schema_cache_lock:
+        now = time.monotonic()
+        for expired_cache_key in [key for key, (expires, _) in _schema_cache.items() if expires <= now]:
+            del _schema_cache[expired_cache_key]
+        _schema_cache[cache_key] = (now + ttl, column_tuples)
+        _schema_cache.move_to_end(cache_key)
+        while len(_schema_cache) > SCHEMA_CACHE_MAX_SIZE:
+            _schema_cache.popitem(last=False)
+
 
 class Scan:
 
@@ -69,7 +112,12 @@ class Scan:
         self.send_scan_end = True
         self.start_time = None
         self.queries_executed = 0
+        self.queries_executed_lock = threading.Lock()
         self.sampler = None
+        # Measurements are sent to the Soda Server by a background thread so that the scan
+        # doesn't wait for the network while it runs the next queries
+        self.measurements_send_queue: Optional[queue.Queue] = None
+        self.measurements_send_errors: List[Exception] = []
 
         self.table_sample_clause = \
             f'\nTABLESAMPLE {scan_yml.sample_method}({scan_yml.sample_percentage})' \
@@ -106,13 +154,15 @@ class Scan:
             if not self.disable_sample_collection:
                 self._process_samples()
 
-            logger.debug(f'Executed {self.queries_executed} queries in {(datetime.now() - self.start_time)}')
+            logger.debug('Executed %d queries in %s', self.queries_executed, datetime.now() - self.start_time)
 
         except Exception as e:
             logger.exception('Exception during scan')
             self.scan_result.add_error(ScanError('Exception during scan', e))
 
         finally:
+            self.wait_for_measurements_sent(stop_sender=True)
+
             if self.soda_server_client and self.send_scan_end:
                 try:
                     self.soda_server_client.scan_ended(self.scan_reference, self.scan_result.errors)
@@ -138,6 +188,7 @@ class Scan:
             custom_metrics = []
             try:
                 logger.debug(f'Fetching custom metrics with scanReference: {self.scan_reference}')
+                self.wait_for_measurements_sent()
                 custom_metrics = self.soda_server_client.custom_metrics(self.scan_reference)
             except Exception as e:
                 logger.error(f'Soda cloud error: Could not fetch custom_metrics: {e}')
@@ -150,6 +201,7 @@ class Scan:
                         monitor_measurement = monitor_metric.execute()
                         self.scan_result.measurements.append(monitor_measurement)
                         monitor_measurement_json = monitor_measurement.to_dict()
+                        self.wait_for_measurements_sent()
                         self.soda_server_client.scan_monitor_measurements(self.scan_reference,
                                                                           monitor_measurement_json)
                         if self.disable_sample_collection:
@@ -172,17 +224,48 @@ class Scan:
                                 logger.info(
                                     f'{monitor_metric.metric_type} is not "negative values metric", failed rows are not sent to Soda Cloud')
 
+    @staticmethod
+    def invalidate_schema_cache(warehouse_name: Optional[str] = None, table_name: Optional[str] = None):
+        """
+        Forgets the cached columns metadata of the given table in all databases and schemas of the warehouse.
+        Without arguments, the whole cache is cleared.  To be called after a table is altered or recreated
+        within the schema_cache_ttl of a scan that uses the schema cache.
+        """
+        with _schema_cache_lock:
+            if warehouse_name is None and table_name is None:
+                _schema_cache.clear()
+            else:
+                for cache_key in [cache_key for cache_key in _schema_cache
+                                  if cache_key[0] == warehouse_name and cache_key[3] == table_name]:
+                    del _schema_cache[cache_key]
+
     def _query_columns_metadata(self):
-        sql = self.warehouse.dialect.sql_columns_metadata_query(self.scan_yml.table_name)
-        column_tuples = self.warehouse.sql_fetchall(sql) if sql != '' else self.warehouse.dialect.sql_columns_metadata(
-            self.scan_yml.table_name)
-        self.queries_executed += 1
+        schema_cache_ttl = self.scan_yml.schema_cache_ttl
+        cache_key = None
+        column_tuples = None
+        if schema_cache_ttl:
+            database_and_schema = self.dialect.get_warehouse_name_and_schema() or {}
+            cache_key = (self.warehouse.name,
+                         database_and_schema.get('database_name'),
+                         database_and_schema.get('database_schema'),
+                         self.scan_yml.table_name)
+            column_tuples = _get_cached_column_tuples(cache_key)
+        if column_tuples is not None:
+            logger.debug('Reusing cached columns metadata of %s', self.scan_yml.table_name)
+        else:
+            sql = self.warehouse.dialect.sql_columns_metadata_query(self.scan_yml.table_name)
+            column_tuples = self.warehouse.sql_fetchall(sql) if sql != '' \
+                else self.warehouse.dialect.sql_columns_metadata(self.scan_yml.table_name)
+            self.queries_executed += 1
+            # A table that is not found (yet) is not cached
+            if cache_key and column_tuples:
+                _cache_column_tuples(cache_key, list(column_tuples), schema_cache_ttl)
 
         self.column_metadatas = []
         for column_tuple in column_tuples:
             name = column_tuple[0]
             data_type = column_tuple[1]
-            nullable = 'YES' == column_tuple[2].upper()
+            nullable = self.dialect.parse_nullable(column_tuple[2])
             self.column_metadatas.append(ColumnMetadata(name=name, data_type=data_type, nullable=nullable))
 
         self.scan_columns: dict = {}
@@ -205,13 +288,13 @@ class Scan:
                     elif scan_column.is_text:
                         column_metadata.logical_type = 'text'
 
-                    logger.debug(f'  {scan_column.column_name} ({scan_column.column.data_type}) '
-                                 f'{"" if scan_column.column.nullable else "not null"}')
+                    logger.debug('  %s (%s) %s', scan_column.column_name, scan_column.column.data_type,
+                                 '' if scan_column.column.nullable else 'not null')
                     self.scan_columns[column_metadata.name.lower()] = scan_column
                 else:
                     logger.info(
                         f'  {scan_column.column_name} ({scan_column.column.data_type}) -> unsupported, skipped!')
-        logger.debug(str(len(self.column_metadatas)) + ' columns:')
+        logger.debug('%d columns:', len(self.column_metadatas))
 
         # Compare the column names in yml with valid column names from the table
         invalid_column_names = set(self.scan_yml.columns.keys()) - set(self.scan_columns.keys())
@@ -225,88 +308,77 @@ class Scan:
         self._flush_measurements([schema_measurement])
 
     def _query_aggregations(self):
-        # This measurements list is used to match measurements with the query field order.
-        # After query execution, the value of the measurements will be extracted from the query result and
-        # the measurements will be added with self.add_query(measurement)
+        # The (metric, column name) of each field, in query field order.
+        # After query execution, the measurements are created with the values of the query result.
+        field_metrics: List[Tuple[str, Optional[str]]] = []
         measurements: List[Measurement] = []
 
         fields: List[str] = []
 
         dialect = self.warehouse.dialect
 
-        if self.scan_yml.is_metric_enabled(Metric.ROW_COUNT):
+        # the row count is the first field if it is enabled
+        is_row_count_enabled = self.scan_yml.is_metric_enabled(Metric.ROW_COUNT)
+        if is_row_count_enabled:
             fields.append(dialect.sql_expr_count_all())
-            measurements.append(Measurement(Metric.ROW_COUNT))
-
-        # maps db column names (lower) to missing and invalid metric indices in the measurements
-        # eg { 'colname': {'missing': 2, 'invalid': 3}, ...}
-        column_metric_indices = {}
+            field_metrics.append((Metric.ROW_COUNT, None))
+
+        # The aggregate fields of text and numeric columns, in query field order, with the dialect method
+        # that builds the field for the length or numeric expression of the column
+        length_aggregations = [(Metric.AVG_LENGTH, dialect.sql_expr_avg),
+                               (Metric.MIN_LENGTH, dialect.sql_expr_min),
+                               (Metric.MAX_LENGTH, dialect.sql_expr_max)]
+        length_metrics = frozenset(metric for metric, _ in length_aggregations)
+        numeric_aggregations = [(Metric.MIN, dialect.sql_expr_min),
+                                (Metric.MAX, dialect.sql_expr_max),
+                                (Metric.AVG, dialect.sql_expr_avg),
+                                (Metric.SUM, dialect.sql_expr_sum),
+                                (Metric.VARIANCE, dialect.sql_expr_variance),
+                                (Metric.STDDEV, dialect.sql_expr_stddev)]
+
+        scan_columns: List[ScanColumn] = list(self.scan_columns.values())
+        # Per scan column, the index of its values count and valid count in the measurements, -1 if not queried
+        non_missing_indices: List[int] = [-1] * len(scan_columns)
+        valid_indices: List[int] = [-1] * len(scan_columns)
 
         try:
-            for column_name_lower, scan_column in self.scan_columns.items():
-                metric_indices = {}
-                column_metric_indices[column_name_lower] = metric_indices
+            for column_index, scan_column in enumerate(scan_columns):
                 column_name = scan_column.column_name
 
                 if scan_column.is_missing_enabled:
-                    metric_indices['non_missing'] = len(measurements)
+                    non_missing_indices[column_index] = len(field_metrics)
                     if scan_column.non_missing_condition:
-                        fields.append(dialect.sql_expr_count_conditional(scan_column.non_missing_condition, column_name, ))
+                        fields.append(dialect.sql_expr_count_conditional(scan_column.non_missing_condition, column_name))
                     else:
                         fields.append(dialect.sql_expr_count(scan_column.qualified_column_name))
-                    measurements.append(Measurement(Metric.VALUES_COUNT, column_name))
+                    field_metrics.append((Metric.VALUES_COUNT, column_name))
 
                 if scan_column.is_valid_enabled:
-                    metric_indices['valid'] = len(measurements)
+                    valid_indices[column_index] = len(field_metrics)
                     if scan_column.non_missing_and_valid_condition:
                         fields.append(dialect.sql_expr_count_conditional(scan_column.non_missing_and_valid_condition, column_name))
                     else:
                         fields.append(dialect.sql_expr_count(scan_column.qualified_column_name))
-                    measurements.append(Measurement(Metric.VALID_COUNT, column_name))
-
-                if scan_column.is_text:
-                    length_expr = dialect.sql_expr_conditional(
-                        scan_column.non_missing_and_valid_condition,
-                        dialect.sql_expr_length(scan_column.qualified_column_name, column_name)) \
-                        if scan_column.non_missing_and_valid_condition \
-                        else dialect.sql_expr_length(scan_column.qualified_column_name)
-
-                    if self.scan_yml.is_metric_enabled(Metric.AVG_LENGTH, column_name):
-                        fields.append(dialect.sql_expr_avg(length_expr, column_name))
-                        measurements.append(Measurement(Metric.AVG_LENGTH, column_name))
+                    field_metrics.append((Metric.VALID_COUNT, column_name))
 
-                    if self.scan_yml.is_metric_enabled(Metric.MIN_LENGTH, column_name):
-                        fields.append(dialect.sql_expr_min(length_expr, column_name))
-                        measurements.append(Measurement(Metric.MIN_LENGTH, column_name))
-
-                    if self.scan_yml.is_metric_enabled(Metric.MAX_LENGTH, column_name):
-                        fields.append(dialect.sql_expr_max(length_expr, column_name))
-                        measurements.append(Measurement(Metric.MAX_LENGTH, column_name))
+                enabled_metrics = scan_column.enabled_metrics
+                if scan_column.is_text and not length_metrics.isdisjoint(enabled_metrics):
+                    # The length expression is built once and shared by the length metrics of the column
+                    length_expr = dialect.sql_expr_length(scan_column.qualified_column_name, column_name)
+                    if scan_column.non_missing_and_valid_condition:
+                        length_expr = dialect.sql_expr_conditional(scan_column.non_missing_and_valid_condition,
+                                                                   length_expr)
+                    for metric, sql_expr_aggregate in length_aggregations:
+                        if metric in enabled_metrics:
+                            fields.append(sql_expr_aggregate(length_expr, column_name))
+                            field_metrics.append((metric, column_name))
 
                 if scan_column.is_numeric:
-                    if scan_column.is_metric_enabled(Metric.MIN):
-                        fields.append(dialect.sql_expr_min(scan_column.numeric_expr, column_name))
-                        measurements.append(Measurement(Metric.MIN, column_name))
-
-                    if scan_column.is_metric_enabled(Metric.MAX):
-                        fields.append(dialect.sql_expr_max(scan_column.numeric_expr, column_name))
-                        measurements.append(Measurement(Metric.MAX, column_name))
-
-                    if scan_column.is_metric_enabled(Metric.AVG):
-                        fields.append(dialect.sql_expr_avg(scan_column.numeric_expr, column_name))
-                        measurements.append(Measurement(Metric.AVG, column_name))
-
-                    if scan_column.is_metric_enabled(Metric.SUM):
-                        fields.append(dialect.sql_expr_sum(scan_column.numeric_expr, column_name))
-                        measurements.append(Measurement(Metric.SUM, column_name))
-
-                    if scan_column.is_metric_enabled(Metric.VARIANCE):
-                        fields.append(dialect.sql_expr_variance(scan_column.numeric_expr, column_name))
-                        measurements.append(Measurement(Metric.VARIANCE, column_name))
-
-                    if scan_column.is_metric_enabled(Metric.STDDEV):
-                        fields.append(dialect.sql_expr_stddev(scan_column.numeric_expr, column_name))
-                        measurements.append(Measurement(Metric.STDDEV, column_name))
+                    numeric_expr = scan_column.numeric_expr
+                    for metric, sql_expr_aggregate in numeric_aggregations:
+                        if metric in enabled_metrics:
+                            fields.append(sql_expr_aggregate(numeric_expr, column_name))
+                            field_metrics.append((metric, column_name))
 
             if len(fields) > 0:
                 sql = 'SELECT \n  ' + ',\n  '.join(fields) + ' \n' \
@@ -319,137 +391,306 @@ class Scan:
                 query_result_tuple = self.warehouse.sql_fetchone(sql)
                 self.queries_executed += 1
 
-                for i in range(0, len(measurements)):
-                    measurement = measurements[i]
-                    measurement.value = query_result_tuple[i]
+                measurements = [Measurement(metric, column_name, value)
+                                for (metric, column_name), value in zip(field_metrics, query_result_tuple)]
+                for measurement in measurements:
                     self._log_measurement(measurement)
 
                 # Calculating derived measurements
-                row_count_measurement = next((m for m in measurements if m.metric == Metric.ROW_COUNT), None)
-                if row_count_measurement:
-                    row_count = row_count_measurement.value
-                    for column_name_lower, scan_column in self.scan_columns.items():
-                        column_name = scan_column.column_name
-                        metric_indices = column_metric_indices[column_name_lower]
-                        non_missing_index = metric_indices.get('non_missing')
-                        if non_missing_index is not None:
-                            values_count = measurements[non_missing_index].value
-                            missing_count = row_count - values_count
-                            missing_percentage = missing_count * 100 / row_count if row_count > 0 else None
-                            values_percentage = values_count * 100 / row_count if row_count > 0 else None
-
-                            self._log_and_append_derived_measurements(measurements, [
-                                Measurement(Metric.MISSING_PERCENTAGE, column_name, missing_percentage),
-                                Measurement(Metric.MISSING_COUNT, column_name, missing_count),
-                                Measurement(Metric.VALUES_PERCENTAGE, column_name, values_percentage)
-                            ])
-
-                            valid_index = metric_indices.get('valid')
-                            if valid_index is not None:
-                                valid_count = measurements[valid_index].value
-                                invalid_count = row_count - missing_count - valid_count
-                                invalid_percentage = invalid_count * 100 / row_count if row_count > 0 else None
-                                valid_percentage = valid_count * 100 / row_count if row_count > 0 else None
-                                self._log_and_append_derived_measurements(measurements, [
-                                    Measurement(Metric.INVALID_PERCENTAGE, column_name, invalid_percentage),
-                                    Measurement(Metric.INVALID_COUNT, column_name, invalid_count),
-                                    Measurement(Metric.VALID_PERCENTAGE, column_name, valid_percentage)
-                                ])
+                row_count = query_result_tuple[0] if is_row_count_enabled else None
+                if row_count is not None:
+                    column_names = []
+                    values_counts = []
+                    valid_counts = []
+                    for scan_column, non_missing_index, valid_index in zip(scan_columns, non_missing_indices,
+                                                                            valid_indices):
+                        if non_missing_index >= 0:
+                            column_names.append(scan_column.column_name)
+                            values_counts.append(measurements[non_missing_index].value)
+                            valid_counts.append(measurements[valid_index].value if valid_index >= 0 else None)
+
+                    self._log_and_append_derived_measurements(measurements, self._get_derived_count_measurements(
+                        row_count, column_names, values_counts, valid_counts))
 
             self._flush_measurements(measurements)
         except Exception as e:
-            logger.debug(f'Exception during aggregation query', exc_info=e)
-            self.scan_result.add_error(ScanError(f'Exception during aggregation query', e))
+            logger.debug('Exception during aggregation query', exc_info=e)
+            self.scan_result.add_error(ScanError('Exception during aggregation query', e))
+
+    @staticmethod
+    def _get_derived_count_measurements(row_count: int,
+                                        column_names: List[str],
+                                        values_counts: List[int],
+                                        valid_counts: List[Optional[int]]) -> List[Measurement]:
+        """
+        Computes the missing and invalid counts and percentages of all columns in a single pass over the
+        values counts and valid counts of the aggregation query.  valid_counts contains None for the
+        columns without validity metrics.
+        """
+        measurements = []
+        has_rows = row_count > 0
+        for column_name, values_count, valid_count in zip(column_names, values_counts, valid_counts):
+            missing_count = row_count - values_count
+            missing_percentage = missing_count * 100 / row_count if has_rows else None
+            values_percentage = values_count * 100 / row_count if has_rows else None
+            measurements.append(Measurement(Metric.MISSING_PERCENTAGE, column_name, missing_percentage))
+            measurements.append(Measurement(Metric.MISSING_COUNT, column_name, missing_count))
+            measurements.append(Measurement(Metric.VALUES_PERCENTAGE, column_name, values_percentage))
+
+            if valid_count is not None:
+                invalid_count = row_count - missing_count - valid_count
+                invalid_percentage = invalid_count * 100 / row_count if has_rows else None
+                valid_percentage = valid_count * 100 / row_count if has_rows else None
+                measurements.append(Measurement(Metric.INVALID_PERCENTAGE, column_name, invalid_percentage))
+                measurements.append(Measurement(Metric.INVALID_COUNT, column_name, invalid_count))
+                measurements.append(Measurement(Metric.VALID_PERCENTAGE, column_name, valid_percentage))
+        return measurements
 
     def _query_group_by_value(self):
-        for column_name_lower, scan_column in self.scan_columns.items():
-            try:
-                measurements = []
-
-                column_name = scan_column.column_name
-
-                if scan_column.is_any_metric_enabled(
-                    [Metric.DISTINCT, Metric.UNIQUENESS, Metric.UNIQUE_COUNT,
-                     Metric.MINS, Metric.MAXS, Metric.FREQUENT_VALUES, Metric.DUPLICATE_COUNT]):
-
-                    group_by_cte = scan_column.get_group_by_cte()
-                    numeric_value_expr = scan_column.get_group_by_cte_numeric_value_expression()
-                    order_by_value_expr = scan_column.get_order_by_cte_value_expression(numeric_value_expr)
-
-                    if self.scan_yml.is_any_metric_enabled(
-                        [Metric.DISTINCT, Metric.UNIQUENESS, Metric.UNIQUE_COUNT, Metric.DUPLICATE_COUNT],
-                        column_name):
-
-                        sql = (f'{group_by_cte} \n'
-                               f'SELECT COUNT(*), \n'
-                               f'       COUNT(CASE WHEN frequency = 1 THEN 1 END), \n'
-                               f'       SUM(frequency) \n'
-                               f'FROM group_by_value')
-
-                        query_result_tuple = self.warehouse.sql_fetchone(sql)
-                        self.queries_executed += 1
-
-                        distinct_count = query_result_tuple[0]
-                        unique_count = query_result_tuple[1]
-                        valid_count = query_result_tuple[2] if query_result_tuple[2] else 0
-                        duplicate_count = distinct_count - unique_count
-
-                        self._log_and_append_query_measurement(
-                            measurements, Measurement(Metric.DISTINCT, column_name, distinct_count))
-                        self._log_and_append_query_measurement(
-                            measurements, Measurement(Metric.UNIQUE_COUNT, column_name, unique_count))
-
-                        derived_measurements = [Measurement(Metric.DUPLICATE_COUNT, column_name, duplicate_count)]
-                        if valid_count > 1:
-                            uniqueness = (distinct_count - 1) * 100 / (valid_count - 1)
-                            derived_measurements.append(Measurement(Metric.UNIQUENESS, column_name, uniqueness))
-                        self._log_and_append_derived_measurements(measurements, derived_measurements)
-
-                    if scan_column.is_metric_enabled(Metric.MINS) and order_by_value_expr:
-                        sql = (f'{group_by_cte} \n'
-                               f'SELECT value \n'
-                               f'FROM group_by_value \n'
-                               f'ORDER BY {order_by_value_expr} ASC \n'
-                               f'{self.dialect.sql_expr_limit(scan_column.mins_maxs_limit)}\n')
-
-                        rows = self.warehouse.sql_fetchall(sql)
-                        self.queries_executed += 1
-
-                        mins = [row[0] for row in rows]
-                        self._log_and_append_query_measurement(measurements,
-                                                               Measurement(Metric.MINS, column_name, mins))
+        scan_columns = [scan_column for scan_column in self.scan_columns.values()
+                        if scan_column.is_any_metric_enabled(GROUP_BY_VALUE_METRICS)]
+        # Dialects that support GROUPING SETS compute the group by values of several columns in a single table scan
+        batch_size = GROUP_BY_VALUE_BATCH_SIZE if self.dialect.supports_grouping_sets else 1
+        batches = [scan_columns[i:i + batch_size] for i in range(0, len(scan_columns), batch_size)]
+
+        max_parallel_queries = min(self.scan_yml.max_parallel_queries, len(batches))
+        if max_parallel_queries > 1:
+            self._query_group_by_value_parallel(batches, max_parallel_queries)
+        else:
+            self._query_group_by_value_serial(batches)
 
-                    if self.scan_yml.is_metric_enabled(Metric.MAXS, column_name) and order_by_value_expr:
-                        sql = (f'{group_by_cte} \n'
-                               f'SELECT value \n'
-                               f'FROM group_by_value \n'
-                               f'ORDER BY {order_by_value_expr} DESC \n'
-                               f'{self.dialect.sql_expr_limit(scan_column.mins_maxs_limit)}\n')
+    def _query_group_by_value_serial(self, batches: List[List[ScanColumn]]):
+        for batch in batches:
+            measurements, scan_errors = self._query_group_by_value_batch_or_columns(batch, self.warehouse.connection)
+            self._flush_measurements(measurements)
+            for scan_error in scan_errors:
+                self.scan_result.add_error(scan_error)
 
-                        rows = self.warehouse.sql_fetchall(sql)
-                        self.queries_executed += 1
+    def _query_group_by_value_parallel(self, batches: List[List[ScanColumn]], max_parallel_queries: int):
+        """
+        Runs the group by value queries concurrently.  DB-API connections can't be used by
+        multiple threads at the same time, so the queries run on extra connections created with
+        Dialect.create_connection.  Session state that is set on the warehouse connection after it is
+        created (eg USE database, search_path or temporary tables) is not available on the extra
+        connections, so max_parallel_queries > 1 requires that create_connection does all session setup.
+        If the extra connections can't be opened, the error is added to the scan result and the queries
+        run one after the other on the warehouse connection.
+        Measurements are flushed on the calling thread in column order.
+        """
+        connections = []
+        try:
+            try:
+                for _ in range(max_parallel_queries):
+                    connections.append(self.dialect.create_connection())
+            except Exception as e:
+                logger.error(f'Could not open connections for parallel group by value queries: {e}')
+                self.scan_result.add_error(
+                    ScanError('Could not open connections for parallel group by value queries', e))
+                self._query_group_by_value_serial(batches)
+                return
+
+            # each worker thread takes a connection for the duration of a query
+            available_connections = queue.Queue()
+            for connection in connections:
+                available_connections.put(connection)
+
+            def query_group_by_value_batch(batch: List[ScanColumn]) -> Tuple[List[Measurement], List[ScanError]]:
+                connection = available_connections.get()
+                try:
+                    return self._query_group_by_value_batch_or_columns(batch, connection)
+                finally:
+                    available_connections.put(connection)
+
+            with ThreadPoolExecutor(max_workers=max_parallel_queries) as executor:
+                futures = [executor.submit(query_group_by_value_batch, batch) for batch in batches]
+                for future in futures:
+                    try:
+                        measurements, scan_errors = future.result()
+                        self._flush_measurements(measurements)
+                        for scan_error in scan_errors:
+                            self.scan_result.add_error(scan_error)
+                    except Exception as e:
+                        self.scan_result.add_error(ScanError('Exception during column group by value queries', e))
+        finally:
+            for connection in connections:
+                try:
+                    connection.close()
+                except Exception as e:
+                    logger.debug('Closing connection failed: %s', e)
 
-                        maxs = [row[0] for row in rows]
-                        self._log_and_append_query_measurement(measurements,
-                                                               Measurement(Metric.MAXS, column_name, maxs))
+    def _query_group_by_value_batch_or_columns(self, scan_columns: List[ScanColumn],
+                                               connection) -> Tuple[List[Measurement], List[ScanError]]:
+        """
+        Computes the group by value metrics of a batch of columns.  If the batch query fails, the columns are
+        queried one by one so that a column that can't be grouped (eg SQL Server TEXT) only loses its own metrics.
+        Returns the measurements in column order and the errors of the failed columns.  Errors are not added
+        to the scan result here because this runs on worker threads for parallel queries.
+        """
+        try:
+            return self._query_group_by_value_batch(scan_columns, connection), []
+        except Exception as e:
+            self._rollback(connection)
+            if len(scan_columns) == 1:
+                column_name = scan_columns[0].column_name
+                return [], [ScanError(f'Exception during group by value queries of column {column_name}', e)]
+            logger.debug('Group by value query of %d columns failed, querying them one by one: %s',
+                         len(scan_columns), e)
+
+        measurements = []
+        scan_errors = []
+        for scan_column in scan_columns:
+            column_measurements, column_scan_errors = \
+                self._query_group_by_value_batch_or_columns([scan_column], connection)
+            measurements.extend(column_measurements)
+            scan_errors.extend(column_scan_errors)
+        return measurements, scan_errors
+
+    @staticmethod
+    def _rollback(connection):
+        """
+        Some warehouses (eg Postgres) abort the transaction on a failed query, which fails all next queries
+        on the connection until it is rolled back
+        """
+        try:
+            connection.rollback()
+        except Exception as e:
+            logger.debug('Rollback failed: %s', e)
 
-                    if self.scan_yml.is_metric_enabled(Metric.FREQUENT_VALUES, column_name):
-                        frequent_values_limit = self.scan_yml.get_frequent_values_limit(column_name)
-                        sql = (f'{group_by_cte} \n'
-                               f'SELECT value, frequency \n'
-                               f'FROM group_by_value \n'
-                               f'ORDER BY frequency DESC \n'
-                               f'{self.dialect.sql_expr_limit(scan_column.mins_maxs_limit)}\n')
+    def _query_group_by_value_batch(self, scan_columns: List[ScanColumn], connection) -> List[Measurement]:
+        """
+        Computes the group by value metrics for the given columns with a single query.
+        The group_by_value CTE has a value_<i> column for each scan column.  With multiple columns, the
+        CTE groups by GROUPING SETS so that the table is only scanned once: the groups of column i are
+        the rows in which value_<i> is not null.  All metrics of all columns are combined with UNION ALL.
+        Each part tags its rows with the column index, the metric name and a position so that
+        the rows can be split up again after the query.
+        """
+        value_columns = [f'value_{i}' for i in range(len(scan_columns))]
+        value_exprs = [scan_column.get_group_by_value_expression() for scan_column in scan_columns]
+
+        # the group by value metrics per scan column, in the same order as scan_columns
+        column_metrics: List[Set[str]] = []
+        selects = []
+        # the value columns of the count rows, which are the same for all scan columns
+        null_values = ', '.join(['NULL' for _ in value_columns])
+        count_exprs = [(Metric.DISTINCT, 'COUNT(*)'),
+                       (Metric.UNIQUE_COUNT, 'COUNT(CASE WHEN frequency = 1 THEN 1 END)'),
+                       (Metric.VALID_COUNT, 'SUM(frequency)')]
+        for i, scan_column in enumerate(scan_columns):
+            column_name = scan_column.column_name
+            value_column = value_columns[i]
+            order_by_value_expr = scan_column.get_order_by_cte_value_expression(value_column)
+            metrics = set()
+            column_metrics.append(metrics)
+
+            if scan_column.is_metric_enabled(Metric.MINS) and order_by_value_expr:
+                metrics.add(Metric.MINS)
+                selects.append(self._sql_group_by_value_ranked(
+                    i, Metric.MINS, value_columns, f'{order_by_value_expr} ASC', scan_column.mins_maxs_limit))
+            if scan_column.is_metric_enabled(Metric.MAXS) and order_by_value_expr:
+                metrics.add(Metric.MAXS)
+                selects.append(self._sql_group_by_value_ranked(
+                    i, Metric.MAXS, value_columns, f'{order_by_value_expr} DESC', scan_column.mins_maxs_limit))
+            if scan_column.is_metric_enabled(Metric.FREQUENT_VALUES):
+                metrics.add(Metric.FREQUENT_VALUES)
+                selects.append(self._sql_group_by_value_ranked(
+                    i, Metric.FREQUENT_VALUES, value_columns, 'frequency DESC',
+                    self.scan_yml.get_frequent_values_limit(column_name)))
+            if scan_column.is_any_metric_enabled(
+                [Metric.DISTINCT, Metric.UNIQUENESS, Metric.UNIQUE_COUNT, Metric.DUPLICATE_COUNT]):
+                metrics.add(Metric.DISTINCT)
+                for metric, count_expr in count_exprs:
+                    selects.append(f'SELECT {i} AS column_index, {self.dialect.literal_string(metric)} AS metric, '
+                                   f'0 AS rank_position, {null_values}, {count_expr} AS frequency \n'
+                                   f'FROM group_by_value \n'
+                                   f'WHERE {value_column} IS NOT NULL')
+
+        if not selects:
+            return []
+
+        value_fields = ''.join([f'    {value_expr} AS {value_column}, \n'
+                                for value_expr, value_column in zip(value_exprs, value_columns)])
+        if len(value_exprs) == 1:
+            group_by = f'GROUP BY {value_exprs[0]}'
+        else:
+            group_by = self.dialect.sql_group_by_grouping_sets(value_exprs)
+        where = f'\n  WHERE {self.filter_sql}' if self.filter_sql else ''
+        sql = (f'WITH group_by_value AS ( \n'
+               f'  SELECT \n'
+               f'{value_fields}'
+               f'    COUNT(*) AS frequency \n'
+               f'  FROM {self.qualified_table_name}{self.table_sample_clause}{where} \n'
+               f'  {group_by} \n'
+               f') \n' + '\nUNION ALL \n'.join(selects))
+
+        rows = sql_fetchall(connection, sql)
+        with self.queries_executed_lock:
+            self.queries_executed += 1
 
-                        rows = self.warehouse.sql_fetchall(sql)
-                        self.queries_executed += 1
-                        frequent_values = [{'value': row[0], 'frequency': row[1]} for row in rows]
-                        self._log_and_append_query_measurement(
-                            measurements, Measurement(Metric.FREQUENT_VALUES, column_name, frequent_values))
+        rows_by_column_and_metric = {}
+        for row in sorted(rows, key=lambda row: row[2]):
+            rows_by_column_and_metric.setdefault((row[0], row[1]), []).append(row)
 
-                self._flush_measurements(measurements)
-            except Exception as e:
-                self.scan_result.add_error(ScanError(f'Exception during column group by value queries', e))
+        measurements = []
+        for i, scan_column in enumerate(scan_columns):
+            column_name = scan_column.column_name
+            metrics = column_metrics[i]
+            value_index = 3 + i
+
+            if Metric.DISTINCT in metrics:
+                distinct_count = int(rows_by_column_and_metric[(i, Metric.DISTINCT)][0][-1])
+                unique_count = int(rows_by_column_and_metric[(i, Metric.UNIQUE_COUNT)][0][-1])
+                valid_count = int(rows_by_column_and_metric[(i, Metric.VALID_COUNT)][0][-1] or 0)
+                duplicate_count = distinct_count - unique_count
+
+                self._log_and_append_query_measurement(
+                    measurements, Measurement(Metric.DISTINCT, column_name, distinct_count))
+                self._log_and_append_query_measurement(
+                    measurements, Measurement(Metric.UNIQUE_COUNT, column_name, unique_count))
+
+                derived_measurements = [Measurement(Metric.DUPLICATE_COUNT, column_name, duplicate_count)]
+                # Computed in Python as decimal division in SQL truncates the result in several warehouses
+                if valid_count > 1:
+                    uniqueness = (distinct_count - 1) * 100 / (valid_count - 1)
+                    derived_measurements.append(Measurement(Metric.UNIQUENESS, column_name, uniqueness))
+                self._log_and_append_derived_measurements(measurements, derived_measurements)
+
+            if Metric.MINS in metrics:
+                mins = [row[value_index] for row in rows_by_column_and_metric.get((i, Metric.MINS), [])]
+                self._log_and_append_query_measurement(measurements,
+                                                       Measurement(Metric.MINS, column_name, mins))
+
+            if Metric.MAXS in metrics:
+                maxs = [row[value_index] for row in rows_by_column_and_metric.get((i, Metric.MAXS), [])]
+                self._log_and_append_query_measurement(measurements,
+                                                       Measurement(Metric.MAXS, column_name, maxs))
+
+            if Metric.FREQUENT_VALUES in metrics:
+                frequent_values = [{'value': row[value_index], 'frequency': int(row[-1])}
+                                   for row in rows_by_column_and_metric.get((i, Metric.FREQUENT_VALUES), [])]
+                self._log_and_append_query_measurement(
+                    measurements, Measurement(Metric.FREQUENT_VALUES, column_name, frequent_values))
+
+        return measurements
+
+    def _sql_group_by_value_ranked(self, column_index: int, metric: str, value_columns: List[str], order_by: str,
+                                   limit: int):
+        """
+        Selects the first limit groups of the column in the given order, tagged with the column index and metric
+        """
+        value_column = value_columns[column_index]
+        fields = ', '.join(value_columns)
+        return (f'SELECT column_index, metric, rank_position, {fields}, frequency \n'
+                f'FROM ( \n'
+                f'  SELECT {column_index} AS column_index, \n'
+                f'         {self.dialect.literal_string(metric)} AS metric, \n'
+                f'         ROW_NUMBER() OVER (ORDER BY {order_by}) AS rank_position, \n'
+                f'         {fields}, \n'
+                f'         frequency \n'
+                f'  FROM group_by_value \n'
+                f'  WHERE {value_column} IS NOT NULL \n'
+                f') {metric}_{column_index} \n'
+                f'WHERE rank_position <= {limit}')
 
     def _query_histograms(self):
 
@@ -557,11 +798,11 @@ class Scan:
             test_variables = self._get_test_variables(scan_column)
             column_name = scan_column.column_name if scan_column is not None else None
 
+            metric_names = sql_metric.metric_names if sql_metric.metric_names is not None \
+                else [field[0] for field in description]
             measurements = []
-            for i in range(len(row_tuple)):
-                metric_name = sql_metric.metric_names[i] if sql_metric.metric_names is not None else description[i][0]
-                metric_value = row_tuple[i]
-                logger.debug(f'SQL metric {sql_metric.title} {metric_name} -> {metric_value}')
+            for metric_name, metric_value in zip(metric_names, row_tuple):
+                logger.debug('SQL metric %s %s -> %s', sql_metric.title, metric_name, metric_value)
                 measurement = Measurement(metric=metric_name, value=metric_value, column_name=column_name)
                 test_variables[metric_name] = metric_value
                 self._log_and_append_query_measurement(measurements, measurement)
@@ -585,16 +826,17 @@ class Scan:
             rows, description = self.warehouse.sql_fetchall_description(resolved_sql)
             self.queries_executed += 1
 
+            metric_names = sql_metric.metric_names if sql_metric.metric_names is not None \
+                else [field[0] for field in description]
+            group_field_flags = [metric_name.lower() in group_fields_lower for metric_name in metric_names]
             group_values_by_metric_name = {}
+            measurement_values_by_column = self._get_measurement_values_by_column()
             for row in rows:
                 group = {}
                 metric_values = {}
 
-                for i in range(len(row)):
-                    metric_name = sql_metric.metric_names[i] if sql_metric.metric_names is not None else description[i][
-                        0]
-                    metric_value = row[i]
-                    if metric_name.lower() in group_fields_lower:
+                for metric_name, metric_value, is_group_field in zip(metric_names, row, group_field_flags):
+                    if is_group_field:
                         group[metric_name] = metric_value
                     else:
                         metric_values[metric_name] = metric_value
@@ -609,10 +851,10 @@ class Scan:
                             group_values_by_metric_name[metric_name] = []
                         group_values = group_values_by_metric_name[metric_name]
                         group_values.append(GroupValue(group=group, value=metric_value))
-                        logger.debug(f'SQL metric {sql_metric.title} {metric_name} {group} -> {metric_value}')
+                        logger.debug('SQL metric %s %s %s -> %s', sql_metric.title, metric_name, group, metric_value)
 
                     sql_metric_tests = sql_metric.tests
-                    test_variables = self._get_test_variables(scan_column)
+                    test_variables = self._get_test_variables(scan_column, measurement_values_by_column)
                     test_variables.update(metric_values)
                     sql_metric_test_results = self._execute_tests(sql_metric_tests, test_variables, group)
                     test_results.extend(sql_metric_test_results)
@@ -656,6 +898,7 @@ class Scan:
 
                         file_path = self.sampler.create_file_path_failed_rows_sql_metric(column_name=column_name,
                                                                                          metric_name=metric_name)
+                        self.wait_for_measurements_sent()
                         file_id = self.soda_server_client.scan_upload(self.scan_reference,
                                                                       file_path,
                                                                       temp_file,
@@ -728,6 +971,7 @@ class Scan:
                             column_name=sql_metric_yml.column_name,
                             metric_name=sql_metric_yml.name)
 
+                        self.wait_for_measurements_sent()
                         file_id = self.soda_server_client.scan_upload(self.scan_reference,
                                                                       file_path,
                                                                       temp_file,
@@ -779,6 +1023,7 @@ class Scan:
                         }
                     metric['columnName'] = scan_column.column_name
                     metrics.append(metric)
+                self.wait_for_measurements_sent()
                 results = self.soda_server_client.historic_metrics(self.warehouse, self.scan_yml.table_name, metrics)
                 measurements = results['measurements']
                 errors = []
@@ -793,13 +1038,30 @@ class Scan:
                 raise RuntimeError("Can't use historic metrics in tests without a connection to Soda Cloud")
         return historic_variables
 
-    def _get_test_variables(self, scan_column: Optional[ScanColumn] = None):
-        column_name_lower = scan_column.column_name_lower if scan_column is not None else None
-        return {
-            measurement.metric: measurement.value
-            for measurement in self.scan_result.measurements
-            if measurement.column_name is None or measurement.column_name.lower() == column_name_lower
-        }
+    def _get_test_variables(self,
+                            scan_column: Optional[ScanColumn] = None,
+                            measurement_values_by_column: Optional[Dict[Optional[str], dict]] = None):
+        """
+        Returns the table measurement values, updated with the measurement values of the given column.
+        Pass measurement_values_by_column when test variables are needed for several columns so that the
+        measurements are only indexed once.
+        """
+        if measurement_values_by_column is None:
+            measurement_values_by_column = self._get_measurement_values_by_column()
+        test_variables = dict(measurement_values_by_column.get(None, {}))
+        if scan_column is not None:
+            test_variables.update(measurement_values_by_column.get(scan_column.column_name_lower, {}))
+        return test_variables
+
+    def _get_measurement_values_by_column(self) -> Dict[Optional[str], dict]:
+        """
+        Maps lower case column names (None for table measurements) to dicts of metric names to values
+        """
+        measurement_values_by_column = {}
+        for measurement in self.scan_result.measurements:
+            column_name_lower = measurement.column_name.lower() if measurement.column_name is not None else None
+            measurement_values_by_column.setdefault(column_name_lower, {})[measurement.metric] = measurement.value
+        return measurement_values_by_column
 
     def _run_table_tests(self):
         test_variables = self._get_test_variables()
@@ -810,9 +1072,10 @@ class Scan:
 
     def _run_column_tests(self):
         test_results = []
+        measurement_values_by_column = self._get_measurement_values_by_column()
         for column_name_lower, scan_column in self.scan_columns.items():
             column_tests = scan_column.get_tests()
-            test_variables = self._get_test_variables(scan_column)
+            test_variables = self._get_test_variables(scan_column, measurement_values_by_column)
             historic_metric_variables = self._get_historic_metric_variables(scan_column)
             # Shallow merge two variable dicts
             test_variables = {**test_variables, **historic_metric_variables}
@@ -870,8 +1133,7 @@ class Scan:
 
     @classmethod
     def _log_measurement(cls, measurement, is_derived: bool = False):
-        measurement_type = "Derived" if is_derived else "Query"
-        logger.debug(f'{measurement_type} measurement: {measurement}')
+        logger.debug('%s measurement: %s', 'Derived' if is_derived else 'Query', measurement)
 
     def _flush_measurements(self, measurements: List[Measurement]):
         """
@@ -880,11 +1142,50 @@ class Scan:
         self.scan_result.measurements.extend(measurements)
         if self.soda_server_client and measurements:
             measurement_jsons = [measurement.to_dict() for measurement in measurements]
+            if self.measurements_send_queue is None:
+                self.measurements_send_queue = queue.Queue()
+                threading.Thread(target=self._send_measurements_worker,
+                                 args=(self.soda_server_client, self.measurements_send_queue),
+                                 name='soda-server-measurements',
+                                 daemon=True).start()
+            self.measurements_send_queue.put((self.scan_reference, measurement_jsons))
+
+    def _send_measurements_worker(self, soda_server_client: SodaServerClient, send_queue: queue.Queue):
+        """
+        Sends the queued measurements to the Soda Server in order until it gets None from the queue.
+        Errors are collected and added to the scan result by wait_for_measurements_sent on the scan thread.
+        This is the only thread using the Soda Server client while the queue is not empty: all other Soda Server
+        calls first wait for the queue so that the command order is kept and the client (incl its token) is
+        never used concurrently.
+        """
+        while True:
+            item = send_queue.get()
             try:
-                self.soda_server_client.scan_measurements(self.scan_reference, measurement_jsons)
+                if item is None:
+                    return
+                scan_reference, measurement_jsons = item
+                soda_server_client.scan_measurements(scan_reference, measurement_jsons)
             except Exception as e:
                 logger.error(f'Soda Cloud error: Could not send measurements: {e}')
-                self.scan_result.add_error(SodaCloudScanError('Could not send measurements', e))
+                self.measurements_send_errors.append(e)
+            finally:
+                send_queue.task_done()
+
+    def wait_for_measurements_sent(self, stop_sender: bool = False):
+        """
+        Blocks until all queued measurements are sent to the Soda Server and adds the send errors to the scan result.
+        With stop_sender, the background thread is ended and a next flush starts a new one.
+        """
+        if self.measurements_send_queue is None:
+            return
+        if stop_sender:
+            self.measurements_send_queue.put(None)
+        self.measurements_send_queue.join()
+        if stop_sender:
+            self.measurements_send_queue = None
+        for e in self.measurements_send_errors:
+            self.scan_result.add_error(SodaCloudScanError('Could not send measurements', e))
+        self.measurements_send_errors = []
 
     def _flush_test_results(self, test_results: List[TestResult]):
         """
@@ -894,6 +1195,8 @@ class Scan:
             self.scan_result.add_test_results(test_results)
 
             if self.soda_server_client:
+                # Keeps the test results after the measurements they were evaluated on
+                self.wait_for_measurements_sent()
                 test_result_jsons = [test_result.to_dict() for test_result in test_results]
                 try:
                     self.soda_server_client.scan_test_results(self.scan_reference, test_result_jsons)
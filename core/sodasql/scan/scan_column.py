@@ -8,7 +8,7 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
-from typing import List, Optional
+from typing import FrozenSet, List, Optional
 
 from sodasql.scan.column_metadata import ColumnMetadata
 from sodasql.scan.dialect import Dialect
@@ -34,27 +34,26 @@ class ScanColumn:
         self.column_name_lower = self.column_name.lower()
         self.scan_yml_column: ScanYmlColumn = \
             self.scan_yml.get_scan_yaml_column(self.column_name)
+        # table level and column level metrics, used for the is_metric_enabled checks in the scan loops
+        self.enabled_metrics: FrozenSet[str] = frozenset(self.scan_yml.metrics or []).union(
+            self.scan_yml_column.metrics if self.scan_yml_column and self.scan_yml_column.metrics else [])
 
         dialect = self.scan.dialect
         self.qualified_column_name = dialect.qualify_column_name(self.column_name, column_metadata.data_type)
-        self.is_text: bool = dialect.is_text(column_metadata.data_type)
-        self.is_number: bool = dialect.is_number(column_metadata.data_type)
-        self.is_time: bool = dialect.is_time(column_metadata.data_type)
-        self.is_supported: bool = dialect.is_supported(column_metadata.data_type)
+        self.is_text, self.is_number, self.is_time, self.is_supported = \
+            dialect.get_data_type_flags(column_metadata.data_type)
 
         if self.is_supported:
             self.missing = self.scan_yml.get_missing(self.column_name)
             self.validity_format = self.scan_yml.get_validity_format(column_metadata)
-            self.is_missing_metric_enabled = self.scan_yml.is_any_metric_enabled(
+            self.is_missing_metric_enabled = self.is_any_metric_enabled(
                 [Metric.MISSING_COUNT, Metric.MISSING_PERCENTAGE,
-                 Metric.VALUES_COUNT, Metric.VALUES_PERCENTAGE],
-                self.column_name)
+                 Metric.VALUES_COUNT, Metric.VALUES_PERCENTAGE])
 
             self.validity = self.scan_yml.get_validity(self.column_name)
-            self.is_validity_metric_enabled = self.scan_yml.is_any_metric_enabled(
+            self.is_validity_metric_enabled = self.is_any_metric_enabled(
                 [Metric.INVALID_COUNT, Metric.INVALID_PERCENTAGE,
-                 Metric.VALID_COUNT, Metric.VALID_PERCENTAGE],
-                self.column_name)
+                 Metric.VALID_COUNT, Metric.VALID_PERCENTAGE])
 
             self.missing_condition, self.is_default_missing_condition = \
                 self.__get_missing_condition(column_metadata, self.missing, dialect)
@@ -68,7 +67,7 @@ class ScanColumn:
 
             self.is_valid_enabled = \
                 (self.validity is not None or self.is_validity_metric_enabled) \
-                or self.scan_yml.is_any_metric_enabled([Metric.DISTINCT, Metric.UNIQUENESS], self.column_name)
+                or self.is_any_metric_enabled([Metric.DISTINCT, Metric.UNIQUENESS])
 
             self.is_missing_enabled = self.is_valid_enabled or self.is_missing_metric_enabled
 
@@ -107,20 +106,11 @@ class ScanColumn:
     def __str__(self):
         return f"{self.column_name}"
 
-    def is_any_metric_enabled(self, metrics: List[str]):
-        for metric in metrics:
-            if self.is_metric_enabled(metric):
-                return True
-        return False
-
-    def is_metric_enabled(self, metric: str):
-        if self.scan_yml_column \
-            and metric in self.scan_yml_column.metrics:
-            return True
-        if self.scan_yml \
-            and self.scan_yml.metrics \
-            and metric in self.scan_yml.metrics:
-            return True
+    def is_any_metric_enabled(self, metrics: List[str]) -> bool:
+        return not self.enabled_metrics.isdisjoint(metrics)
+
+    def is_metric_enabled(self, metric: str) -> bool:
+        return metric in self.enabled_metrics
 
     @classmethod
     def __get_missing_condition(cls, column_metadata: ColumnMetadata, missing: Missing, dialect: Dialect):
@@ -183,14 +173,9 @@ class ScanColumn:
         return ''
 
     def get_group_by_cte(self):
-        if self.non_missing_and_valid_condition and self.scan.table_sample_clause:
-            where = f'{self.non_missing_and_valid_condition}\n    {self.scan.table_sample_clause}'
-        elif self.non_missing_and_valid_condition:
-            where = self.non_missing_and_valid_condition
-        elif self.scan.table_sample_clause:
-            where = self.scan.table_sample_clause
-        else:
-            where = f'{self.qualified_column_name} IS NOT NULL'
+        where = self.non_missing_and_valid_condition \
+            if self.non_missing_and_valid_condition \
+            else f'{self.qualified_column_name} IS NOT NULL'
 
         if self.scan.filter_sql:
             where = f'{where}\n  AND {self.scan.filter_sql}'
@@ -200,7 +185,7 @@ class ScanColumn:
             f"  SELECT \n"
             f"    {self.qualified_column_name} AS value, \n"
             f"    COUNT(*) AS frequency \n"
-            f"  FROM {self.scan.qualified_table_name} \n"
+            f"  FROM {self.scan.qualified_table_name}{self.scan.table_sample_clause} \n"
             f"  WHERE {where} \n"
             f"  GROUP BY {self.qualified_column_name} \n"
             f")"
@@ -212,13 +197,22 @@ class ScanColumn:
         if self.is_column_numeric_text_format:
             return self.scan.dialect.sql_expr_cast_text_to_number('value', self.validity_format)
 
-    def get_order_by_cte_value_expression(self, numeric_value_expr: str):
+    def get_group_by_value_expression(self):
+        """
+        The expression to group by: the column value if it is not missing and valid, NULL otherwise
+        """
+        if self.non_missing_and_valid_condition:
+            return self.scan.dialect.sql_expr_conditional(self.non_missing_and_valid_condition,
+                                                          self.qualified_column_name)
+        return self.qualified_column_name
+
+    def get_order_by_cte_value_expression(self, value_expr: str = 'value'):
         if self.is_number or self.is_time:
-            return 'value'
+            return value_expr
         if self.is_column_numeric_text_format:
-            return self.scan.dialect.sql_expr_cast_text_to_number('value', self.validity_format)
+            return self.scan.dialect.sql_expr_cast_text_to_number(value_expr, self.validity_format)
         elif self.is_text:
-            return 'value'
+            return value_expr
         return None
 
     def get_tests(self):
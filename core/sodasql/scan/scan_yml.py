@@ -34,25 +34,26 @@ class ScanYml:
     sample_method: str = None
     mins_maxs_limit: int = None
     frequent_values_limit: int = None
+    # number of column queries that may run concurrently, each on its own connection from Dialect.create_connection.
+    # Session state that is set on the warehouse connection after it is created is not shared with those connections
+    max_parallel_queries: int = 1
+    # number of seconds that the columns metadata of the table is reused by later scans in the same process,
+    # 0 disables the schema cache
+    schema_cache_ttl: int = 0
     # None means no samples to be taken
     samples_yml: SamplesYml = None
 
     def is_any_metric_enabled(self, metrics: List[str], column_name: Optional[str] = None):
-        for metric in self.__get_metrics(column_name):
-            if metric in metrics:
-                return True
-        return False
+        return any(self.is_metric_enabled(metric, column_name) for metric in metrics)
 
     def is_metric_enabled(self, metric: str, column_name: Optional[str] = None):
-        return metric in self.__get_metrics(column_name)
-
-    def __get_metrics(self, column_name: Optional[str] = None) -> Set[str]:
-        metrics = self.metrics.copy()
+        if metric in self.metrics:
+            return True
         if column_name:
             column_configuration = self.columns.get(column_name.lower())
             if column_configuration is not None and column_configuration.metrics is not None:
-                metrics.update(column_configuration.metrics)
-        return metrics
+                return metric in column_configuration.metrics
+        return False
 
     def get_missing(self, column_name: str):
         scan_yml_column = self.columns.get(column_name.lower())
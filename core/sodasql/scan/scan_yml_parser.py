@@ -36,6 +36,8 @@ KEY_COLUMNS = 'columns'
 KEY_EXCLUDED_COLUMNS = 'excluded_columns'
 KEY_MINS_MAXS_LIMIT = 'mins_maxs_limit'
 KEY_FREQUENT_VALUES_LIMIT = 'frequent_values_limit'
+KEY_MAX_PARALLEL_QUERIES = 'max_parallel_queries'
+KEY_SCHEMA_CACHE_TTL = 'schema_cache_ttl'
 KEY_SAMPLE_PERCENTAGE = 'sample_percentage'
 KEY_SAMPLE_METHOD = 'sample_method'
 KEY_FILTER = 'filter'
@@ -43,7 +45,8 @@ KEY_SAMPLES = 'samples'
 
 VALID_SCAN_YML_KEYS = [KEY_TABLE_NAME, KEY_METRICS, KEY_METRIC_GROUPS, KEY_SQL_METRICS,
                        KEY_TESTS, KEY_COLUMNS, KEY_MINS_MAXS_LIMIT, KEY_FREQUENT_VALUES_LIMIT,
-                       KEY_SAMPLE_PERCENTAGE, KEY_SAMPLE_METHOD, KEY_FILTER, KEY_SAMPLES, KEY_EXCLUDED_COLUMNS]
+                       KEY_SAMPLE_PERCENTAGE, KEY_SAMPLE_METHOD, KEY_FILTER, KEY_SAMPLES, KEY_EXCLUDED_COLUMNS,
+                       KEY_MAX_PARALLEL_QUERIES, KEY_SCHEMA_CACHE_TTL]
 
 COLUMN_KEY_METRICS = KEY_METRICS
 COLUMN_KEY_METRIC_GROUPS = KEY_METRIC_GROUPS
@@ -131,6 +134,8 @@ class ScanYmlParser(Parser):
         self.scan_yml.columns = self.parse_columns(self.scan_yml)
         self.scan_yml.mins_maxs_limit = self.get_int_optional(KEY_MINS_MAXS_LIMIT, 5)
         self.scan_yml.frequent_values_limit = self.get_int_optional(KEY_FREQUENT_VALUES_LIMIT, 5)
+        self.scan_yml.max_parallel_queries = self.get_int_optional(KEY_MAX_PARALLEL_QUERIES, 1)
+        self.scan_yml.schema_cache_ttl = self.get_int_optional(KEY_SCHEMA_CACHE_TTL, 0)
         self.scan_yml.samples_yml = self.parse_samples_yml(KEY_SAMPLES)
 
         # TODO change the next 2 properties to filter_tablesample (similar to samples.table_tablesample)
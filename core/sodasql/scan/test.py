@@ -8,13 +8,46 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+import ast
 import logging
 from dataclasses import dataclass, field
-from typing import Optional, List
+from functools import lru_cache
+from types import CodeType
+from typing import Optional, List, Tuple
 from jinja2 import Template
 
 logger = logging.getLogger(__name__)
 
+EXPRESSION_DELIMITERS = ["<=", ">=", "<", ">", "=="]
+
+
+@dataclass(frozen=True)
+class CompiledExpression:
+    code: CodeType
+    # Left side of the first delimiter in the expression, used to report the expression result
+    left_code: Optional[CodeType]
+    # Variable names referenced in the expression, in order of first appearance
+    names: Tuple[str, ...]
+
+
+@lru_cache(maxsize=1024)
+def compile_expression(expression: str) -> CompiledExpression:
+    """
+    Parses and compiles a test expression once.  Tests are evaluated for every column and every group,
+    so the compiled code is cached per expression string.
+    """
+    tree = ast.parse(expression, mode='eval')
+    names = tuple(dict.fromkeys(node.id for node in ast.walk(tree) if isinstance(node, ast.Name)))
+
+    left_code = None
+    for delimiter in EXPRESSION_DELIMITERS:
+        if delimiter in expression:
+            left, _, _ = expression.partition(delimiter)
+            left_code = compile(left, '<test>', 'eval')
+            break
+
+    return CompiledExpression(code=compile(tree, '<test>', 'eval'), left_code=left_code, names=names)
+
 
 @dataclass
 class Test:
@@ -23,7 +56,7 @@ class Test:
     expression: str
     metrics: List[str]
     column: Optional[str]
-    expression_delimiters = ["<=", ">=", "<", ">", "=="]
+    expression_delimiters = EXPRESSION_DELIMITERS
     source: str = field(default="soda-sql")
 
     def evaluate(
@@ -35,9 +68,10 @@ class Test:
         from sodasql.scan.test_result import TestResult
 
         try:
-            values = {key: test_variables[key] for key in test_variables if key in self.metrics}
             if template_variables is not None:
                 self.expression = Template(self.expression).render(template_variables)
+            compiled_expression = compile_expression(self.expression)
+            values = {name: test_variables[name] for name in compiled_expression.names if name in test_variables}
             if "None" not in self.expression and any(v is None for v in values.values()):
                 logger.warning(
                     f"Skipping test {self.expression} since corresponding metrics are None ({values}) "
@@ -46,18 +80,14 @@ class Test:
                     test=self, skipped=True, passed=True, values=values, group_values=group_values
                 )
             else:
-                passed = bool(eval(self.expression, test_variables))
+                passed = bool(eval(compiled_expression.code, test_variables))
 
                 # Evaluate more complex expressions and save result of the expression.
-                for delimiter in self.expression_delimiters:
-                    if delimiter in self.expression:
-                        left, _, _ = self.expression.partition(delimiter)
-                        # Make sure the expression result is the first key in the resulting dict.
-                        expression_result = {"expression_result": eval(left, test_variables)}
-                        expression_result.update(values)
-                        values = expression_result
-
-                        break
+                if compiled_expression.left_code is not None:
+                    # Make sure the expression result is the first key in the resulting dict.
+                    expression_result = {"expression_result": eval(compiled_expression.left_code, test_variables)}
+                    expression_result.update(values)
+                    values = expression_result
 
                 test_result = TestResult(
                     test=self,
@@ -11,7 +11,8 @@
 import logging
 from typing import List
 
-from sodasql.scan.db import sql_fetchone, sql_fetchall, sql_fetchone_description, sql_fetchall_description
+from sodasql.scan.db import sql_fetchone, sql_fetchall, sql_fetchone_description, sql_fetchall_description, \
+    sql_fetchall_column0
 from sodasql.scan.dialect import Dialect
 from sodasql.scan.warehouse_yml import WarehouseYml
 from sodasql.telemetry.soda_telemetry import SodaTelemetry
@@ -40,6 +41,9 @@ class Warehouse:
     def sql_fetchall_description(self, sql) -> tuple:
         return sql_fetchall_description(self.connection, sql)
 
+    def sql_fetchall_column0(self, sql) -> list:
+        return sql_fetchall_column0(self.connection, sql)
+
     def create_scan(self, *args, **kwargs):
         return self.dialect.create_scan(self, *args, **kwargs)
 
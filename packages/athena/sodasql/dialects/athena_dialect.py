@@ -22,6 +22,8 @@ from sodasql.scan.aws_credentials import AwsCredentials
 
 
 class AthenaDialect(Dialect):
+    supports_grouping_sets = True
+
     @staticmethod
     def get_aws_credentials_optional(parser: Parser):
         access_key_id = parser.get_str_optional_env('access_key_id')
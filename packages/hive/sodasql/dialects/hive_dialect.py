@@ -12,7 +12,7 @@
 from pyhive import hive
 from pyhive.exc import Error
 from thrift.transport.TTransport import TTransportException
-from typing import Optional
+from typing import List, Optional
 
 from sodasql.exceptions.exceptions import WarehouseConnectionError
 from sodasql.scan.dialect import Dialect, HIVE, KEY_WAREHOUSE_TYPE
@@ -25,6 +25,7 @@ logger = logging.getLogger(__name__)
 
 class HiveDialect(Dialect):
     data_type_decimal = "DECIMAL"
+    supports_grouping_sets = True
 
     def __init__(self, parser: Parser):
         super().__init__(HIVE)
@@ -149,6 +150,11 @@ class HiveDialect(Dialect):
     def sql_expr_stddev(self, expr: str, column_name):
         return f'STDDEV_POP({expr})'
 
+    def sql_group_by_grouping_sets(self, exprs: List[str]):
+        # Hive requires the grouping expressions to be listed before GROUPING SETS
+        grouping_sets = ', '.join([f'({expr})' for expr in exprs])
+        return f'GROUP BY {", ".join(exprs)} GROUPING SETS ({grouping_sets})'
+
     def qualify_regex(self, regex) -> str:
         return self.escape_metacharacters(regex).replace("'", "\\'")
 
@@ -22,6 +22,7 @@ logger = logging.getLogger(__name__)
 
 
 class PostgresDialect(Dialect):
+    supports_grouping_sets = True
 
     def __init__(self, parser: Parser = None, type: str = POSTGRES):
         super().__init__(type)
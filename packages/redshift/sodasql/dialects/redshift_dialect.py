@@ -21,6 +21,8 @@ from sodasql.scan.aws_credentials import AwsCredentials
 
 
 class RedshiftDialect(PostgresDialect):
+    # GROUPING SETS depends on the Redshift version
+    supports_grouping_sets = False
 
     @staticmethod
     def get_aws_credentials_optional(parser: Parser):
@@ -24,6 +24,7 @@ logger = logging.getLogger(__name__)
 
 
 class SnowflakeDialect(Dialect):
+    supports_grouping_sets = True
     reserved_keywords = [
         "ACCOUNT",
         "ALL",
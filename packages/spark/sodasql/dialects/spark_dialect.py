@@ -138,6 +138,7 @@ class SparkConnectionMethod(str, Enum):
 
 class SparkDialect(Dialect):
     data_type_decimal = "DECIMAL"
+    supports_grouping_sets = True
 
     def __init__(self, parser: Parser):
         super().__init__(SPARK)
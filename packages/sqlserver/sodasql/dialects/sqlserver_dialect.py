@@ -40,6 +40,7 @@ logger = logging.getLogger(__name__)
 
 
 class SQLServerDialect(Dialect):
+    supports_grouping_sets = True
 
     def __init__(self, parser: Parser = None, type: str = SQLSERVER):
         super().__init__(type)
@@ -21,6 +21,7 @@ logger = logging.getLogger(__name__)
 
 
 class TrinoDialect(Dialect):
+    supports_grouping_sets = True
     reserved_keywords = [
         "ALTER",
         "AND",
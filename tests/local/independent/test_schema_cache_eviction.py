@@ -0,0 +1,48 @@
+#  Copyright 2020 Soda
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+from unittest import TestCase
+from unittest.mock import patch
+
+from sodasql.scan import scan
+
+
+class TestSchemaCacheEviction(TestCase):
+
+    def setUp(self) -> None:
+        scan.Scan.invalidate_schema_cache()
+
+    def tearDown(self) -> None:
+        scan.Scan.invalidate_schema_cache()
+
+    @staticmethod
+    def cache_key(table_name: str):
+        return 'warehouse', 'database', 'schema', table_name
+
+    def test_least_recently_used_is_evicted(self):
+        with patch.object(scan, 'SCHEMA_CACHE_MAX_SIZE', 2):
+            scan._cache_column_tuples(self.cache_key('a'), [('id', 'integer', 'YES')], 300)
+            scan._cache_column_tuples(self.cache_key('b'), [('id', 'integer', 'YES')], 300)
+            # a is used, so b is now the least recently used table
+            self.assertIsNotNone(scan._get_cached_column_tuples(self.cache_key('a')))
+            scan._cache_column_tuples(self.cache_key('c'), [('id', 'integer', 'YES')], 300)
+
+        self.assertEqual(list(scan._schema_cache.keys()), [self.cache_key('a'), self.cache_key('c')])
+        self.assertIsNone(scan._get_cached_column_tuples(self.cache_key('b')))
+
+    def test_expired_entries_are_evicted(self):
+        scan._cache_column_tuples(self.cache_key('a'), [('id', 'integer', 'YES')], 0)
+        self.assertIsNone(scan._get_cached_column_tuples(self.cache_key('a')))
+
+        scan._cache_column_tuples(self.cache_key('b'), [('id', 'integer', 'YES')], 0)
+        scan._cache_column_tuples(self.cache_key('c'), [('id', 'integer', 'YES')], 300)
+
+        # Expired entries are removed on insert, even if they are never read again
+        self.assertEqual(list(scan._schema_cache.keys()), [self.cache_key('c')])
@@ -270,3 +270,9 @@ class TestSqlExpressions(TestCase):
                 'type': 'null'
             }
         }))
+
+    def test_parse_nullable(self):
+        for value in ['YES', 'yes', 'Y', '1', 1, True]:
+            self.assertTrue(self.dialect.parse_nullable(value), value)
+        for value in ['NO', 'no', 'N', '0', 0, False, None]:
+            self.assertFalse(self.dialect.parse_nullable(value), value)
@@ -0,0 +1,33 @@
+#  Copyright 2020 Soda
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+from unittest import TestCase
+
+from sodasql.scan import test
+from sodasql.scan.test import compile_expression
+
+
+class TestTestEvaluation(TestCase):
+
+    def test_compile_expression_names(self):
+        compiled_expression = compile_expression('min_length >= 1 and max > avg + min_length')
+        self.assertEqual(('min_length', 'max', 'avg'), compiled_expression.names)
+        self.assertIs(compiled_expression, compile_expression('min_length >= 1 and max > avg + min_length'))
+
+    def test_evaluate_values(self):
+        soda_test = test.Test(id='id', title='title', expression='max - min < 10', metrics=['max', 'min'], column='size')
+        test_result = soda_test.evaluate({'min': 1, 'max': 5, 'min_length': 3})
+        self.assertTrue(test_result.passed)
+        self.assertEqual({'expression_result': 4, 'max': 5, 'min': 1}, test_result.values)
+
+    def test_evaluate_skipped_on_none(self):
+        soda_test = test.Test(id='id', title='title', expression='max < 10', metrics=['max'], column='size')
+        test_result = soda_test.evaluate({'max': None})
+        self.assertTrue(test_result.skipped)
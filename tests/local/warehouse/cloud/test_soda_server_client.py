@@ -10,8 +10,10 @@
 #  limitations under the License.
 import json
 import logging
+import time
 
 from sodasql.scan.metric import Metric
+from sodasql.scan.scan_error import SodaCloudScanError
 from tests.common.sql_test_case import SqlTestCase
 
 
@@ -113,3 +115,81 @@ class TestSodaServerClient(SqlTestCase):
                     ]}
             }
         })
+
+    def test_soda_server_client_measurements_error(self):
+        self.use_mock_soda_server_client()
+
+        def scan_measurements(scan_reference, measurement_jsons):
+            raise RuntimeError('Soda Server unavailable')
+
+        self.mock_soda_server_client.scan_measurements = scan_measurements
+
+        self.sql_recreate_table(
+            [f"name {self.dialect.data_type_varchar_255}"],
+            ["('one')",
+             "(null)"])
+
+        scan_result = self.scan({
+            'metrics': [
+                Metric.ROW_COUNT
+            ]
+        })
+
+        # Measurements are sent in the background, the send errors are added before the scan ends
+        self.assertEqual(scan_result.get(Metric.ROW_COUNT), 2)
+        self.assertTrue(any(isinstance(error, SodaCloudScanError) for error in scan_result.get_errors()))
+        self.assertEqual(self.mock_soda_server_client.commands[-1]['type'], 'sodaSqlScanEnd')
+
+    def test_soda_server_client_command_order(self):
+        self.use_mock_soda_server_client()
+
+        # Slow measurement sends make the background sender lag behind the scan
+        scan_measurements = self.mock_soda_server_client.scan_measurements
+
+        def slow_scan_measurements(scan_reference, measurement_jsons):
+            time.sleep(0.05)
+            return scan_measurements(scan_reference, measurement_jsons)
+
+        self.mock_soda_server_client.scan_measurements = slow_scan_measurements
+
+        self.sql_recreate_table(
+            [f"id {self.dialect.data_type_varchar_255}",
+             f"date {self.dialect.data_type_varchar_255}"],
+            ["('1', '2021-01-01')",
+             "('x', '2021-01-02')",
+             "(null, null)"])
+
+        scan_result = self.scan({
+            'metric_groups': [
+                Metric.METRIC_GROUP_MISSING,
+                Metric.METRIC_GROUP_VALIDITY
+            ],
+            'samples': {
+                'table_limit': 5,
+                'failed_limit': 5
+            },
+            'columns': {
+                'id': {
+                    'valid_format': 'number_whole',
+                    'tests': [
+                        'invalid_count == 0'
+                    ]
+                }
+            }
+        })
+
+        self.assertFalse(scan_result.has_errors())
+        command_types = [command['type'] + (f"/{command['sampleType']}" if command['type'] == 'sodaSqlScanFile' else '')
+                         for command in self.mock_soda_server_client.commands]
+        self.assertEqual(command_types, [
+            'sodaSqlScanStart',
+            'sodaSqlScanMeasurements',
+            'sodaSqlScanMeasurements',
+            'sodaSqlMonitorMeasurement',
+            'sodaSqlScanTestResults',
+            'sodaSqlScanFile/datasetSample',
+            'sodaSqlScanFile/missingSample',
+            'sodaSqlScanFile/invalidSample',
+            'sodaSqlScanFile/missingSample',
+            'sodaSqlScanEnd'
+        ])
@@ -8,9 +8,11 @@
 #  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 #  See the License for the specific language governing permissions and
 #  limitations under the License.
+from unittest.mock import patch
 
 from sodasql.scan.metric import Metric
-from sodasql.scan.scan_yml_parser import KEY_METRICS
+from sodasql.scan.scan_column import ScanColumn
+from sodasql.scan.scan_yml_parser import KEY_METRICS, KEY_COLUMNS
 from tests.common.sql_test_case import SqlTestCase
 
 
@@ -46,3 +48,101 @@ class TestDistinctAndUniqueness(SqlTestCase):
 
         # values 2, 3 and 4 occur multiple times -> 3 duplicates
         self.assertEqual(scan_result.get(Metric.DUPLICATE_COUNT, 'score'), 3)
+
+    def test_distinct_multiple_columns(self):
+        self.sql_recreate_table(
+            [f"score {self.dialect.data_type_varchar_255}",
+             f"size {self.dialect.data_type_integer}"],
+            ["('1', 1)",
+             "('2', 1)",
+             "('2', 2)",
+             "('3', 3)",
+             "('x', 3)",
+             "(null, null)"])
+
+        scan_result = self.scan({
+            KEY_METRICS: [
+                'distinct'
+            ],
+            KEY_COLUMNS: {
+                'score': {
+                    'valid_format': 'number_whole'
+                }
+            }
+        })
+
+        # the invalid value 'x' is not a distinct value
+        self.assertEqual(scan_result.get(Metric.DISTINCT, 'score'), 3)
+        self.assertEqual(scan_result.get(Metric.UNIQUE_COUNT, 'score'), 2)
+        self.assertEqual(scan_result.get(Metric.DISTINCT, 'size'), 3)
+        self.assertEqual(scan_result.get(Metric.UNIQUE_COUNT, 'size'), 1)
+
+    def test_uniqueness_single_value(self):
+        self.sql_recreate_table(
+            [f"score {self.dialect.data_type_varchar_255}"],
+            ["('1')",
+             "(null)"])
+
+        scan_result = self.scan({
+            KEY_METRICS: [
+                'distinct'
+            ]
+        })
+
+        self.assertEqual(scan_result.get(Metric.DISTINCT, 'score'), 1)
+        # uniqueness is undefined for less than 2 valid values
+        self.assertIsNone(scan_result.find_measurement(Metric.UNIQUENESS, 'score'))
+
+    def test_uniqueness_exact_value(self):
+        self.sql_recreate_table(
+            [f"score {self.dialect.data_type_varchar_255}"],
+            ["('1')",
+             "('2')",
+             "('2')",
+             "('3')",
+             "(null)"])
+
+        scan_result = self.scan({
+            KEY_METRICS: [
+                'uniqueness'
+            ]
+        })
+
+        # (3 distinct - 1) * 100 / (4 valid - 1), not truncated by the decimal precision of the warehouse
+        self.assertEqual(scan_result.get(Metric.UNIQUENESS, 'score'), 200 / 3)
+
+    def test_group_by_value_batch_with_failing_column(self):
+        self.sql_recreate_table(
+            [f"name {self.dialect.data_type_varchar_255}",
+             f"size {self.dialect.data_type_integer}",
+             f"score {self.dialect.data_type_integer}"],
+            ["('one',   1, 3)",
+             "('two',   2, 3)",
+             "('two',   3, 4)",
+             "(null,    null, null)"])
+
+        get_order_by_cte_value_expression = ScanColumn.get_order_by_cte_value_expression
+
+        def get_failing_order_by_cte_value_expression(scan_column, value_expr='value'):
+            if scan_column.column_name.lower() == 'size':
+                return 'unknown_column'
+            return get_order_by_cte_value_expression(scan_column, value_expr)
+
+        # The 3 columns are queried in one batch, in which the size column fails
+        with patch.object(self.dialect, 'supports_grouping_sets', True), \
+                patch.object(ScanColumn, 'get_order_by_cte_value_expression',
+                             get_failing_order_by_cte_value_expression):
+            scan_result = self.scan({
+                KEY_METRICS: [
+                    Metric.DISTINCT,
+                    Metric.MINS
+                ]
+            })
+
+        self.assertEqual([error.message.lower() for error in scan_result.get_errors()],
+                         ['exception during group by value queries of column size'])
+        self.assertEqual(scan_result.get(Metric.DISTINCT, 'name'), 2)
+        self.assertEqual(scan_result.get(Metric.MINS, 'name'), ['one', 'two'])
+        self.assertEqual(scan_result.get(Metric.DISTINCT, 'score'), 2)
+        self.assertEqual(scan_result.get(Metric.MINS, 'score'), [3, 4])
+        self.assertIsNone(scan_result.find_measurement(Metric.DISTINCT, 'size'))
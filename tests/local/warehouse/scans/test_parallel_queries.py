@@ -0,0 +1,142 @@
+#  Copyright 2020 Soda
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from unittest.mock import patch
+
+from sodasql.scan.metric import Metric
+from sodasql.scan.scan_column import ScanColumn
+from sodasql.scan.scan_yml_parser import KEY_METRICS, KEY_MAX_PARALLEL_QUERIES
+from tests.common.sql_test_case import SqlTestCase
+
+
+class ConnectionSpy:
+    """
+    Delegates to a warehouse connection and records whether it was closed
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.is_closed = False
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+    def close(self):
+        self.is_closed = True
+        self.connection.close()
+
+
+class TestParallelQueries(SqlTestCase):
+
+    def test_parallel_group_by_value_queries(self):
+        self.sql_recreate_table(
+            [f"name {self.dialect.data_type_varchar_255}",
+             f"size {self.dialect.data_type_integer}",
+             f"score {self.dialect.data_type_integer}"],
+            ["('one',   1, 3)",
+             "('two',   2, 3)",
+             "('two',   3, 4)",
+             "('three', 3, 5)",
+             "(null,    null, null)"])
+
+        connection_spies = []
+        create_connection = self.dialect.create_connection
+
+        def create_connection_spy():
+            connection_spy = ConnectionSpy(create_connection())
+            connection_spies.append(connection_spy)
+            return connection_spy
+
+        # One query per column, so that there are several queries to run in parallel
+        with patch.object(self.dialect, 'supports_grouping_sets', False), \
+                patch.object(self.dialect, 'create_connection', side_effect=create_connection_spy):
+            scan_result = self.scan({
+                KEY_METRICS: [
+                    Metric.DISTINCT,
+                    Metric.MINS
+                ],
+                KEY_MAX_PARALLEL_QUERIES: 2
+            })
+
+        self.assertFalse(scan_result.has_errors())
+        self.assertEqual(scan_result.get(Metric.DISTINCT, 'name'), 3)
+        self.assertEqual(scan_result.get(Metric.DISTINCT, 'size'), 3)
+        self.assertEqual(scan_result.get(Metric.DISTINCT, 'score'), 3)
+        self.assertEqual(scan_result.get(Metric.MINS, 'name'), ['one', 'three', 'two'])
+        self.assertEqual(scan_result.get(Metric.MINS, 'size'), [1, 2, 3])
+        self.assertEqual(scan_result.get(Metric.MINS, 'score'), [3, 4, 5])
+
+        # The queries ran on 2 extra connections that are closed after the queries
+        self.assertEqual(len(connection_spies), 2)
+        self.assertTrue(all(connection_spy.is_closed for connection_spy in connection_spies))
+
+    def test_parallel_group_by_value_queries_query_error(self):
+        self.sql_recreate_table(
+            [f"name {self.dialect.data_type_varchar_255}",
+             f"size {self.dialect.data_type_integer}",
+             f"score {self.dialect.data_type_integer}"],
+            ["('one',   1, 3)",
+             "('two',   2, 3)",
+             "('two',   3, 4)",
+             "(null,    null, null)"])
+
+        get_order_by_cte_value_expression = ScanColumn.get_order_by_cte_value_expression
+
+        def get_failing_order_by_cte_value_expression(scan_column, value_expr='value'):
+            if scan_column.column_name.lower() == 'size':
+                return 'unknown_column'
+            return get_order_by_cte_value_expression(scan_column, value_expr)
+
+        # The query of the size column fails on one of the worker threads
+        with patch.object(self.dialect, 'supports_grouping_sets', False), \
+                patch.object(ScanColumn, 'get_order_by_cte_value_expression',
+                             get_failing_order_by_cte_value_expression):
+            scan_result = self.scan({
+                KEY_METRICS: [
+                    Metric.DISTINCT,
+                    Metric.MINS
+                ],
+                KEY_MAX_PARALLEL_QUERIES: 2
+            })
+
+        self.assertEqual([error.message.lower() for error in scan_result.get_errors()],
+                         ['exception during group by value queries of column size'])
+        # The measurements of the other queries are flushed in column order
+        self.assertEqual([measurement.column_name.lower() for measurement in scan_result.measurements
+                          if measurement.metric in [Metric.DISTINCT, Metric.MINS]],
+                         ['name', 'name', 'score', 'score'])
+        self.assertEqual(scan_result.get(Metric.MINS, 'name'), ['one', 'two'])
+        self.assertEqual(scan_result.get(Metric.MINS, 'score'), [3, 4])
+
+    def test_parallel_group_by_value_queries_connection_error(self):
+        self.sql_recreate_table(
+            [f"name {self.dialect.data_type_varchar_255}",
+             f"size {self.dialect.data_type_integer}"],
+            ["('one',   1)",
+             "('two',   2)",
+             "('two',   3)",
+             "(null,    null)"])
+
+        # One query per column, so that there are several queries to run in parallel
+        with patch.object(self.dialect, 'supports_grouping_sets', False), \
+                patch.object(self.dialect, 'create_connection', side_effect=RuntimeError('Connection refused')):
+            scan_result = self.scan({
+                KEY_METRICS: [
+                    Metric.DISTINCT
+                ],
+                KEY_MAX_PARALLEL_QUERIES: 2
+            })
+
+        # The connection error is reported and the queries run on the warehouse connection instead
+        self.assertEqual([error.message for error in scan_result.get_errors()],
+                         ['Could not open connections for parallel group by value queries'])
+        self.assertEqual(scan_result.get(Metric.DISTINCT, 'name'), 2)
+        self.assertEqual(scan_result.get(Metric.DISTINCT, 'size'), 3)
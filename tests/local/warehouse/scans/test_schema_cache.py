@@ -0,0 +1,63 @@
+#  Copyright 2020 Soda
+#  Licensed under the Apache License, Version 2.0 (the "License");
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#   http://www.apache.org/licenses/LICENSE-2.0
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+
+from sodasql.scan.metric import Metric
+from sodasql.scan.scan import Scan
+from sodasql.scan.scan_yml_parser import KEY_METRICS, KEY_SCHEMA_CACHE_TTL
+from tests.common.sql_test_case import SqlTestCase
+
+
+class TestSchemaCache(SqlTestCase):
+
+    def test_schema_cache(self):
+        Scan.invalidate_schema_cache()
+        self.sql_recreate_table(
+            [f"name {self.dialect.data_type_varchar_255}"],
+            ["('one')"])
+
+        scan_result = self.scan({KEY_METRICS: [Metric.ROW_COUNT], KEY_SCHEMA_CACHE_TTL: 300})
+        self.assertEqual(self.get_column_names(scan_result), ['name'])
+
+        self.recreate_table_with_size_column()
+
+        # The columns metadata of the first scan is reused
+        scan_result = self.scan({KEY_METRICS: [Metric.ROW_COUNT], KEY_SCHEMA_CACHE_TTL: 300})
+        self.assertEqual(self.get_column_names(scan_result), ['name'])
+
+        Scan.invalidate_schema_cache(self.warehouse.name, self.default_test_table_name)
+
+        scan_result = self.scan({KEY_METRICS: [Metric.ROW_COUNT], KEY_SCHEMA_CACHE_TTL: 300})
+        self.assertEqual(self.get_column_names(scan_result), ['name', 'size'])
+
+    def test_schema_cache_disabled_by_default(self):
+        self.sql_recreate_table(
+            [f"name {self.dialect.data_type_varchar_255}"],
+            ["('one')"])
+
+        scan_result = self.scan({KEY_METRICS: [Metric.ROW_COUNT]})
+        self.assertEqual(self.get_column_names(scan_result), ['name'])
+
+        self.recreate_table_with_size_column()
+
+        scan_result = self.scan({KEY_METRICS: [Metric.ROW_COUNT]})
+        self.assertEqual(self.get_column_names(scan_result), ['name', 'size'])
+
+    def recreate_table_with_size_column(self):
+        table_name = self.dialect.qualify_writable_table_name(self.default_test_table_name)
+        self.sql_update(f"DROP TABLE {table_name}")
+        self.sql_update(self.sql_create_table([f"name {self.dialect.data_type_varchar_255}",
+                                               f"size {self.dialect.data_type_integer}"],
+                                              self.default_test_table_name))
+        self.warehouse.connection.commit()
+
+    @staticmethod
+    def get_column_names(scan_result):
+        return [column['name'].lower() for column in scan_result.get(Metric.SCHEMA)]